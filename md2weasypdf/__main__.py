@@ -1,4 +1,3 @@
-import json
 import os
 import shutil
 import time
@@ -7,8 +6,8 @@ from functools import partial
 from hashlib import sha1
 from pathlib import Path
 from subprocess import DEVNULL, CalledProcessError, check_call, check_output
-from threading import Timer
-from typing import Callable, List, Optional
+from threading import Condition, Thread
+from typing import Callable, List, Optional, Set
 
 import typer
 from rich.console import Console
@@ -16,7 +15,13 @@ from typing_extensions import Annotated
 from watchdog.events import FileSystemEvent, FileSystemEventHandler
 from watchdog.observers import Observer
 
-from .printer import Printer
+from .printer import CACHE_DIR, Printer
+
+try:
+    from orjson import loads as json_loads
+
+except ImportError:
+    from json import loads as json_loads
 
 console = Console()
 
@@ -24,19 +29,45 @@ warnings.showwarning = lambda message, category, filename, lineno, file, line: c
 
 
 def debounce(wait):
+    """Delay calls until there was no further call for `wait` seconds, the arguments of all coalesced calls are passed as a list.
+
+    A single worker thread per decorated function waits for the deadline, which is moved with every call.
+    """
+
     def decorator(fn):
-        def debounced(*args, **kwargs):
-            def call_it():
-                fn(*args, **kwargs)
+        condition = Condition()
+        pending = []
+        deadline: Optional[float] = None
+        worker: Optional[Thread] = None
 
-            try:
-                debounced.t.cancel()
+        def run():
+            nonlocal deadline
+            while True:
+                with condition:
+                    condition.wait_for(lambda: deadline is not None)
+                    while (remaining := deadline - time.monotonic()) > 0:
+                        condition.wait(remaining)
 
-            except AttributeError:
-                pass
+                    args = pending.copy()
+                    pending.clear()
+                    deadline = None
 
-            debounced.t = Timer(wait, call_it)
-            debounced.t.start()
+                try:
+                    fn(args)
+
+                except Exception:
+                    console.print_exception()
+
+        def debounced(arg):
+            nonlocal deadline, worker
+            with condition:
+                pending.append(arg)
+                deadline = time.monotonic() + wait
+                if worker is None:
+                    worker = Thread(target=run, daemon=True)
+                    worker.start()
+
+                condition.notify()
 
         return debounced
 
@@ -44,18 +75,21 @@ def debounce(wait):
 
 
 class FileChangeHandler(FileSystemEventHandler):
-    def __init__(self, render: Callable[[Optional[Path]], None]) -> None:
+    def __init__(self, render: Callable[[Optional[List[Path]]], None]) -> None:
         self._render = render
+        self.render = debounce(1)(self._render_events)
+
+    def _render_events(self, events: List[FileSystemEvent]):
+        paths: Optional[Set[Path]] = set()
+        for event in events:
+            path = Path(event.src_path).absolute()
+            if event.is_directory or event.event_type != 'modified' or path.suffix != '.md':
+                paths = None
+                break
 
-    @debounce(1)
-    def render(self, event: FileSystemEvent):
-        path = None
-        if not event.is_directory and event.event_type in ('modified'):
-            path = Path(event.src_path)
-            if path.suffix != '.md':
-                path = None
+            paths.add(path)
 
-        self._render(path)
+        self._render(sorted(paths) if paths else None)
         console.log("Render complete")
 
     def on_created(self, event: FileSystemEvent):
@@ -92,6 +126,10 @@ def main(
         Optional[str],
         typer.Option(help="Regular expression to filter files in input directory by subpath and/or filename"),
     ] = None,
+    filename_filter_fullmatch: Annotated[
+        bool,
+        typer.Option(help="Require the filename filter to match the whole subpath instead of any part of it"),
+    ] = False,
     meta: Annotated[
         Optional[str],
         typer.Option(help="Metadata for document generation passed to the layout, pass values using a JSON object"),
@@ -99,13 +137,17 @@ def main(
     watch: Annotated[bool, typer.Option(help="Watch input directory for changes and re-run the conversion")] = False,
     only_modified_in_commit: Annotated[Optional[str], typer.Option(help="Only print documents which have been changed in the given commit")] = None,
     keep_tree: Annotated[bool, typer.Option(help="Preserve tree of input files for output files")] = False,
+    jobs: Annotated[
+        Optional[int], typer.Option(help="Number of processes used to print documents in parallel, defaults to the number of CPUs")
+    ] = None,
+    force: Annotated[bool, typer.Option(help="Convert and print documents even when their sources have not changed since the last run")] = False,
 ):
     if (
         layouts_dir
         and layouts_dir.endswith(".git")
         and (layouts_dir.startswith("https://") or layouts_dir.startswith("ssh://") or layouts_dir.startswith("git@"))
     ):
-        layouts_dir_path = Path(f"~/.cache/md2weasypdf/{sha1(layouts_dir.encode('utf-8')).hexdigest()}").expanduser()
+        layouts_dir_path = CACHE_DIR / sha1(layouts_dir.encode('utf-8')).hexdigest()
         layouts_dir_path.mkdir(parents=True, exist_ok=True)
         try:
             if not (layouts_dir_path / ".git").exists():
@@ -142,9 +184,9 @@ def main(
             console.print("Layouts dir does not exists", style="bold red")
             raise typer.Exit(11)
 
-    combined_meta = json.loads(meta) if meta else {}
+    combined_meta = json_loads(meta) if meta else {}
     if env_meta := os.getenv('MD2WEASYPDF_META'):
-        combined_meta = json.loads(env_meta) | combined_meta
+        combined_meta = json_loads(env_meta) | combined_meta
 
     try:
         printer = Printer(
@@ -158,30 +200,35 @@ def main(
             output_html=output_html,
             output_md=output_md,
             filename_filter=filename_filter,
+            filename_filter_fullmatch=filename_filter_fullmatch,
             meta=combined_meta,
             keep_tree=keep_tree,
+            jobs=jobs,
+            force=force,
         )
 
     except ValueError as error:
         console.print("Error:", error, style="bold red")
         raise typer.Exit(1)
 
-    modified_files: List[Path] = []
+    modified_files: Set[Path] = set()
     if only_modified_in_commit:
-        modified_files = [
+        modified_files = {
             Path(file).absolute()
-            for file in str(check_output(["git", "diff-tree", "--no-commit-id", "--name-only", "-r", only_modified_in_commit]), "utf-8").splitlines()
-        ]
+            for file in check_output(
+                ["git", "diff-tree", "--no-commit-id", "--name-only", "-r", only_modified_in_commit], encoding="utf-8"
+            ).splitlines()
+        }
 
-    def execute(path: Optional[Path] = None):
-        documents = [path] if path else printer.get_documents()
+    def execute(paths: Optional[List[Path]] = None):
+        documents = paths
         if only_modified_in_commit:
-            documents = [file for file in documents if file in modified_files]
+            documents = [file for file in (paths or printer.get_documents()) if file in modified_files]
 
         try:
             for document, output_path in printer.execute(documents=documents):
                 console.log(
-                    "Created PDF",
+                    "Unchanged PDF" if document.unchanged else "Created PDF",
                     f'"{document.title}"',
                     f"(out of {len(document.articles)})" if len(document.articles) > 1 else f"(from {document.articles[0].source})",
                     "->",
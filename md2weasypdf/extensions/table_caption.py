@@ -12,7 +12,12 @@ class TableCaptionExtension(Extension):
 
     def extendMarkdown(self, md):
         """Insert after AbbrPreprocessor."""
-        md.treeprocessors.register(TableCaptionProcessor(md, self), 'tablecaption', 5)
+        md.registerExtension(self)
+        self.processor = TableCaptionProcessor(md, self)
+        md.treeprocessors.register(self.processor, 'tablecaption', 5)
+
+    def reset(self) -> None:
+        self.processor.tables = []
 
 
 class TableCaptionProcessor(Treeprocessor):
@@ -1,41 +1,250 @@
 import hashlib
 import json
+import mimetypes
 import os
 import re
 import warnings
-from copy import deepcopy
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from datetime import date, datetime
-from functools import cache
-from glob import glob
-from itertools import chain
+from functools import cache, cached_property, lru_cache
+from html import unescape as unescape_html
+from importlib.metadata import PackageNotFoundError, version
+from itertools import chain, islice
+from multiprocessing import get_context
 from pathlib import Path
-from subprocess import DEVNULL, CalledProcessError, check_output
-from typing import Callable, Iterable, List, Optional, Tuple
+from subprocess import DEVNULL, CalledProcessError, check_output, run
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, List, Optional, Tuple
 from urllib.error import URLError
-from urllib.parse import urlparse
+from urllib.parse import unquote, urlparse
+from urllib.request import url2pathname
 
 import frontmatter
-import lxml.html
 import yaml
-from jinja2 import Environment, FileSystemLoader, Template, select_autoescape
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template, select_autoescape
 from jsonschema import ValidationError
 from jsonschema import validate as validate_json_with_schema
 from markdown import Markdown
-from weasyprint import HTML, default_url_fetcher
+from markdown import __version__ as markdown_version
 
 from . import extensions
 
+try:
+    from yaml import CSafeLoader as SafeLoader
+
+except ImportError:
+    from yaml import SafeLoader  # type: ignore
+
+try:
+    from orjson import loads as json_loads
+
+except ImportError:
+    from json import loads as json_loads
+
+if TYPE_CHECKING:
+    from weasyprint import CSS
+    from weasyprint.css.counters import CounterStyle
+    from weasyprint.text.fonts import FontConfiguration
+
+CACHE_DIR = Path(os.getenv("MD2WEASYPDF_CACHE_DIR", "~/.cache/md2weasypdf")).expanduser()
+
+
+@cache
+def _package_version(package: str = "md2weasypdf") -> str:
+    try:
+        return version(package)
+
+    except PackageNotFoundError:
+        return "dev"
+
+
+def _write_atomic(path: Path, data: str | bytes):
+    """Write to a temporary file next to `path` and move it into place, so readers never see partial files."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        if isinstance(data, bytes):
+            tmp_path.write_bytes(data)
+
+        else:
+            tmp_path.write_text(data, encoding="utf-8")
+
+        os.replace(tmp_path, path)
+
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def _get_bytecode_cache(kind: str) -> Optional[FileSystemBytecodeCache]:
+    """Bytecode cache per kind of environment, as compiled templates depend on its settings such as autoescaping."""
+    try:
+        (directory := CACHE_DIR / "jinja" / kind).mkdir(parents=True, exist_ok=True)
+
+    except OSError:
+        return None
+
+    return FileSystemBytecodeCache(str(directory))
+
+
+_LAYOUT_ENTRYPOINTS = ["index.html.j2", "index.html"]
+_autoescape_by_extension = select_autoescape()
+
+
+def _layout_autoescape(template_name: Optional[str]) -> bool:
+    """Escape the entrypoints of layouts like templates rendered from strings, files included by them according to their extension."""
+    return template_name is None or template_name.rsplit("/", 1)[-1] in _LAYOUT_ENTRYPOINTS or _autoescape_by_extension(template_name)
+
+
+@lru_cache(maxsize=64)
+def _get_template_env(searchpath: Tuple[str, ...]) -> Environment:
+    """Environment for rendering articles, shared by all articles with the same searchpath.
+
+    The template cache is disabled, so every included file passes the loader and is recorded in the `loaded_paths` of the current article,
+    compiled templates are reused from the bytecode cache instead.
+    """
+    return Environment(
+        autoescape=select_autoescape(),
+        loader=FileSystemWithFrontmatterLoader(searchpath=list(searchpath)),
+        bytecode_cache=_get_bytecode_cache("articles"),
+        cache_size=0,
+    )
+
+
+@lru_cache(maxsize=256)
+def _compile_template(env: Environment, source: str) -> Template:
+    """Compile a template from source once, e.g. a `_template.md` shared by many yaml files."""
+    return env.from_string(source)
+
+
+_JINJA_TOKENS = ("{{", "{%", "{#")
+_LINK_RE = re.compile(r"<link\b[^>]*>", re.IGNORECASE)
+_ATTRIBUTE_RE = re.compile(r"""\b([\w-]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""")
+_STYLE_RE = re.compile(r"<style\b", re.IGNORECASE)
+_STYLE_ATTRIBUTE_RE = re.compile(r"\sstyle\s*=", re.IGNORECASE)
+# imported stylesheets are not inspected, they may contain important declarations as well
+_IMPORTANT_RE = re.compile(r"!\s*important|@import", re.IGNORECASE)
+
+
+def _parse_attributes(tag: str) -> dict[str, str]:
+    return {name.lower(): double or single or bare for name, double, single, bare in _ATTRIBUTE_RE.findall(tag)}
+
+
+@lru_cache(maxsize=64)
+def _has_important_declarations(path: str, mtime_ns: int) -> bool:
+    return bool(_IMPORTANT_RE.search(Path(path).read_text(encoding="utf-8", errors="replace")))
+
+
+@lru_cache(maxsize=16)
+def _load_stylesheets(stylesheets: Tuple[Tuple[str, int], ...], url_fetcher: Callable) -> Tuple[List["CSS"], "FontConfiguration", "CounterStyle"]:
+    """Parse stylesheets once per url fetcher, the modification times are part of the cache key to pick up changes in watch mode.
+
+    WeasyPrint requires the same font configuration and counter styles for a document and its stylesheets, they are only shared between
+    documents using exactly the same stylesheets to not leak `@font-face` and `@counter-style` rules between layouts.
+    """
+    from weasyprint import CSS
+    from weasyprint.css.counters import CounterStyle
+    from weasyprint.text.fonts import FontConfiguration
+
+    font_config, counter_style = FontConfiguration(), CounterStyle()
+    return (
+        [CSS(filename=path, url_fetcher=url_fetcher, font_config=font_config, counter_style=counter_style) for path, _ in stylesheets],
+        font_config,
+        counter_style,
+    )
+
+
+_REFERENCE_RE = re.compile(r"""\b(?:src|href)\s*=\s*["']([^"'#]+)""", re.IGNORECASE)
+
+
+def _files_fingerprint(paths: Iterable[Path]) -> List[Tuple[str, int, int]]:
+    fingerprint = []
+    for path in paths:
+        try:
+            stat = path.stat()
+
+        except OSError:
+            continue
+
+        fingerprint.append((str(path), stat.st_size, stat.st_mtime_ns))
+
+    return sorted(fingerprint)
+
+
+def _directory_fingerprint(directory: Path) -> List[Tuple[str, int, int]]:
+    return _files_fingerprint(Path(root) / file for root, _, files in os.walk(directory) for file in files)
+
+
+@lru_cache(maxsize=4096)
+def _read_cached_content(cache_key: str) -> str:
+    return (CACHE_DIR / "content" / f"{cache_key}.html").read_text(encoding="utf-8")
+
+
+_FRONTMATTER_BOUNDARY_RE = re.compile(r"^-{3,}\s*$", re.MULTILINE)
+
+
+def _split_frontmatter(text: str) -> Optional[Tuple[str, str]]:
+    """Split the stripped `text` into its raw yaml frontmatter and content like python-frontmatter, None if it has to parse it itself."""
+    if not text.startswith("---") and text.partition("\n")[0] != "{":
+        return "", text
+
+    # the same boundaries as python-frontmatter, the closing one may be written e.g. as `----` and followed by `---` rules
+    if (opening := _FRONTMATTER_BOUNDARY_RE.match(text)) and (closing := _FRONTMATTER_BOUNDARY_RE.search(text, opening.end())):
+        return text[opening.end() : closing.start()], text[closing.end() :].strip()
+
+    return None
+
+
+def _strip_frontmatter(text: str) -> str:
+    """Return the content of `text` without its frontmatter, without parsing the yaml block when it is well-formed."""
+    text = text.strip()
+    if split := _split_frontmatter(text):
+        return split[1]
+
+    return frontmatter.loads(text).content
+
+
+def _load_frontmatter(text: str) -> Tuple[dict[str, object], str]:
+    """Return the metadata and content of `text`, only parsing the yaml block instead of the whole text when it is well-formed."""
+    text = text.strip()
+    if not (split := _split_frontmatter(text)):
+        post = frontmatter.loads(text)
+        return post.metadata, post.content
+
+    raw_metadata, content = split
+    metadata = yaml.load(raw_metadata, Loader=SafeLoader) if raw_metadata else None
+    return metadata if isinstance(metadata, dict) else {}, content
+
+
+_TITLE_RE = re.compile(r"(\([^\)]+\))|(\[[^\]]+\])")
+_PAREN_RE = re.compile(r"\([^\)]+\)")
+_WS_RE = re.compile(r"\s+")
+_HEADLINE_RE = re.compile(r"[ \r\n]*<h1\b[^>]*>(.*?)</h1>", re.IGNORECASE | re.DOTALL)
+_TAG_RE = re.compile(r"<[^>]+>")
+_AUTHOR_RE = re.compile(rb"^\s*\d+\t(.+) <([^>]*)>\r?$", re.MULTILINE)
+
 
 class FileSystemWithFrontmatterLoader(FileSystemLoader):
-    def __init__(self, *args, loaded_paths: set[Path] = None, **kwargs) -> None:
+    def __init__(self, *args, loaded_paths: Optional[set[Path]] = None, **kwargs) -> None:
         super().__init__(*args, **kwargs)
         self.loaded_paths = loaded_paths
 
+    @contextmanager
+    def record_loaded_paths(self, loaded_paths: set[Path]):
+        """Record the paths of all templates loaded within the context into `loaded_paths`, allowing the loader to be shared."""
+        previous_loaded_paths, self.loaded_paths = self.loaded_paths, loaded_paths
+        try:
+            yield
+
+        finally:
+            self.loaded_paths = previous_loaded_paths
+
     def get_source(self, environment: Environment, template: str) -> Tuple[str, str, Callable[[], bool]]:
         contents, path, uptodate = super().get_source(environment, template)
-        self.loaded_paths.add(Path(path))
-        return frontmatter.loads(contents).content, path, uptodate
+        if self.loaded_paths is not None:
+            self.loaded_paths.add(Path(path))
+
+        return _strip_frontmatter(contents), path, uptodate
 
 
 @dataclass
@@ -43,6 +252,7 @@ class Article:
     source: Path
     template_loader_searchpaths: list[str | Path] = field(default_factory=list)
     meta: dict[str, object] = field(default_factory=dict)
+    use_content_cache: bool = True
 
     def __post_init__(self):
         self.loaded_paths: set[Path] = set()
@@ -56,23 +266,21 @@ class Article:
         else:
             raise NotImplementedError(f"No handling for {self.source.suffix} files implemented")
 
-    def _get_template_env(self):
-        return Environment(
-            autoescape=select_autoescape(),
-            loader=FileSystemWithFrontmatterLoader(
-                searchpath=[os.path.dirname(self.source), *self.template_loader_searchpaths, os.getcwd()],
-                loaded_paths=self.loaded_paths,
-            ),
-        )
+    def _render_template(self, source: str, *args) -> str:
+        env = _get_template_env(tuple(str(path) for path in [os.path.dirname(self.source), *self.template_loader_searchpaths, os.getcwd()]))
+        with env.loader.record_loaded_paths(self.loaded_paths):  # type: ignore  # always a FileSystemWithFrontmatterLoader
+            return _compile_template(env, source).render(*args)
 
     def _init_md(self):
         with open(self.source, mode="r", encoding="utf-8") as file:
-            article = frontmatter.load(file)
+            metadata, content = _load_frontmatter(file.read())
 
-        article_template = self._get_template_env().from_string(article.content)
+        self.meta |= metadata
+        if any(token in content for token in _JINJA_TOKENS):
+            self.content_md = self._render_template(content)
 
-        self.meta |= article.metadata
-        self.content_md = article_template.render()
+        else:
+            self.content_md = content
 
     @staticmethod
     @cache
@@ -83,11 +291,11 @@ class Article:
             if (template_path := directory / "_template.md").exists() or (template_path := directory / "_template.md.j2").exists():
                 schema = None
                 if (schema_path := directory / "schema.json").exists():
-                    with open(schema_path, mode="r", encoding="utf-8") as file:
-                        schema = json.load(file)
+                    with open(schema_path, mode="rb") as file:
+                        schema = json_loads(file.read())
 
                 with open(template_path, mode="r", encoding="utf-8") as file:
-                    return frontmatter.load(file), schema
+                    return _load_frontmatter(file.read()), schema
 
             directory = directory.parent
 
@@ -95,9 +303,9 @@ class Article:
 
     def _init_yaml(self):
         with open(self.source, mode="r", encoding="utf-8") as file:
-            article = yaml.load(file, Loader=yaml.Loader)
+            article = yaml.load(file, Loader=SafeLoader)
 
-        md_template, schema = self._yaml_md_template(self.source.parent)
+        (template_metadata, template_content), schema = self._yaml_md_template(self.source.parent)
         if schema:
             try:
                 validate_json_with_schema(article, schema)
@@ -105,74 +313,95 @@ class Article:
             except ValidationError as error:
                 raise ValueError(f"Error validating schema of {self.source}: {error}") from error
 
-        article_template = self._get_template_env().from_string(md_template.content)
-
-        self.meta |= md_template.metadata | getattr(article, "metadata", {})
-        self.content_md = article_template.render(article)
+        self.meta |= template_metadata | getattr(article, "metadata", {})
+        self.content_md = self._render_template(template_content, article)
 
-    @property
+    @cached_property
     def title(self) -> str:
-        return re.sub(r"(\([^\)]+\))|(\[[^\]]+\])", "", self.source.name.removesuffix(self.source.suffix).replace("_", " ")).strip()
+        return _TITLE_RE.sub("", self.source.name.removesuffix(self.source.suffix).replace("_", " ")).strip()
 
-    @property
+    @cached_property
     def filename(self) -> str:
-        return re.sub(r"\s+", " ", re.sub(r"\([^\)]+\)", "", self.source.name.removesuffix(self.source.suffix))).strip()
+        return _WS_RE.sub(" ", _PAREN_RE.sub("", self.source.name.removesuffix(self.source.suffix))).strip()
 
-    @property
+    def _content_cache_key(self) -> str:
+        # third-party extensions are versioned separately from markdown
+        fingerprint = json.dumps(
+            [_package_version(), markdown_version, _package_version("markdown-grid-tables"), self.source.name, *Printer.markdown_options(self)]
+        )
+        return hashlib.sha256(self.content_md.encode("utf-8") + b"|" + fingerprint.encode("utf-8")).hexdigest()[:16]
+
+    @cached_property
     def content(self) -> str:
-        md = Markdown(extensions=[e for e in Printer.enabled_extensions(self) if e], tab_length=int(str(self.meta.get("tab_length", 2))))
+        cache_key = self._content_cache_key()
+        if self.use_content_cache:
+            try:
+                return _read_cached_content(cache_key)
 
-        return md.convert(self.content_md)
+            except OSError:
+                pass
 
-    @property
+        content = Printer.get_markdown(self).convert(self.content_md)
+
+        try:
+            _write_atomic(CACHE_DIR / "content" / f"{cache_key}.html", content)
+
+        except OSError as error:
+            warnings.warn(f"Could not write content cache for {self.source}: {error}")
+
+        return content
+
+    @cached_property
+    def _headline(self) -> Optional[str]:
+        """Text of the h1 heading the content starts with, if any."""
+        if not (match := _HEADLINE_RE.match(self.content)):
+            return None
+
+        return unescape_html(_TAG_RE.sub("", match.group(1)))
+
+    @cached_property
     def has_custom_headline(self) -> bool:
-        return self.content.strip(" \r\n").startswith("<h1")
+        return self._headline is not None
 
-    @property
+    @cached_property
     def alt_title(self) -> str:
-        if not self.has_custom_headline:
+        if self._headline is None:
             return self.title
 
-        return lxml.html.fromstring("<root>" + self.content.strip(" \r\n") + "</root>").find("h1").text_content()
+        return self._headline
 
-    @property
-    def authors(self):
+    @cached_property
+    def authors(self) -> set[Tuple[str, str]]:
         try:
-            return set(
-                chain.from_iterable(
-                    (
-                        author.strip().split("\t")[1][:-1].rsplit(' <', 1)
-                        for author in str(
-                            check_output(["git", "shortlog", "-s", "-n", "-e" "HEAD", "--", path], stderr=DEVNULL), "utf-8"
-                        ).splitlines()
-                    )
-                    for path in [self.source, *self.loaded_paths]
-                )
+            shortlog = check_output(
+                ["git", "shortlog", "-s", "-n", "-e", "HEAD", "--", self.source, *self.loaded_paths],
+                stderr=DEVNULL,
             )
 
         except CalledProcessError:
             return set()
 
-    @property
-    def hash(self):
-        try:
-            hashes = [check_output(["git", "hash-object", path]) for path in [self.source, *self.loaded_paths]]
+        return {(name.decode("utf-8"), email.decode("utf-8")) for name, email in _AUTHOR_RE.findall(shortlog)}
 
-        except CalledProcessError:
-            return [hashlib.sha1(path.read_bytes()).hexdigest() for path in [self.source, *self.loaded_paths]]
+    @staticmethod
+    def _git_object_hash(path: Path) -> str:
+        """Hash the file the same way as `git hash-object` does, without spawning a git process."""
+        data = path.read_bytes()
+        return hashlib.sha1(b"blob %d\0" % len(data) + data, usedforsecurity=False).hexdigest()
 
+    @cached_property
+    def hash(self):
+        hashes = [self._git_object_hash(path) for path in [self.source, *sorted(self.loaded_paths)]]
         if len(hashes) == 1:
-            return str(hashes[0], "utf-8")
+            return hashes[0]
 
-        return hashlib.sha1(b"".join(hashes)).hexdigest()
+        return hashlib.sha1("".join(f"{h}\n" for h in hashes).encode("utf-8")).hexdigest()
 
-    @property
+    @cached_property
     def modified_date(self):
         try:
-            dates = [
-                str(check_output(["git", "log", "-1", "--pretty=%cs", path], stderr=DEVNULL), "utf-8").strip()
-                for path in [self.source, *self.loaded_paths]
-            ]
+            # the latest commit touching any of the paths carries the latest date
+            return check_output(["git", "log", "-1", "--pretty=%cs", "--", self.source, *self.loaded_paths], stderr=DEVNULL, encoding="utf-8").strip()
 
         except CalledProcessError:
             dates = [datetime.fromtimestamp(os.path.getmtime(path)).date().isoformat() for path in [self.source, *self.loaded_paths]]
@@ -180,6 +409,72 @@ class Article:
         return sorted(dates, reverse=True)[0]
 
 
+@dataclass(frozen=True)
+class _DocumentUrlFetcher:
+    """
+    Fetch urls for a document, looking up local files missing in the layout directory in the source directories of its articles.
+
+    Fetchers of documents with the same layout and source directories are equal, so stylesheets loaded with them can be shared.
+    """
+
+    layout_dir: Path
+    source_dirs: Tuple[Path, ...]
+
+    @cached_property
+    def _asset_index(self) -> dict[str, Path]:
+        """Files directly within the source directories by name, earlier directories taking precedence."""
+        index: dict[str, Path] = {}
+        for source_dir in self.source_dirs:
+            try:
+                with os.scandir(source_dir) as entries:
+                    for entry in entries:
+                        if entry.name not in index and entry.is_file():
+                            index[entry.name] = Path(entry.path).absolute()
+
+            except OSError:
+                continue
+
+        return index
+
+    def __call__(self, url: str, timeout=10, ssl_context=None):
+        from weasyprint import default_url_fetcher
+
+        try:
+            return default_url_fetcher(url, timeout=timeout, ssl_context=ssl_context)
+
+        except URLError as error:
+            if not url.startswith('file://'):
+                raise
+
+            try:
+                # weasyprint resolves relative urls against the absolute base url, i.e. the layout directory
+                local_relative_path = Path(url2pathname(urlparse(url).path)).relative_to(os.path.abspath(self.layout_dir))
+
+            except ValueError:
+                raise error from None
+
+            if len(local_relative_path.parts) == 1:
+                if path := self._asset_index.get(local_relative_path.name):
+                    return self._fetch_local_file(path)
+
+                raise
+
+            for source_dir in self.source_dirs:
+                if (path := source_dir / local_relative_path).is_file():
+                    return self._fetch_local_file(path.absolute())
+
+            raise
+
+    @staticmethod
+    def _fetch_local_file(path: Path) -> dict[str, object]:
+        """Pass a local file to weasyprint directly instead of opening it through urllib, weasyprint closes the file after reading."""
+        return {
+            "file_obj": path.open("rb"),
+            "mime_type": mimetypes.guess_type(path.name)[0] or "application/octet-stream",
+            "redirected_url": path.as_uri(),
+        }
+
+
 @dataclass
 class Document:
     title: str
@@ -189,6 +484,14 @@ class Document:
     layout_dir: Path
     articles: List[Article]
     meta: dict[str, object]
+    date: str = field(default_factory=lambda: date.today().isoformat())
+    commit: Optional[str] = field(default_factory=lambda: Document.get_commit())
+    layout_fingerprint: Optional[List[Tuple[str, int, int]]] = None
+    unchanged: bool = field(default=False, init=False)
+
+    def __getstate__(self):
+        # the compiled template cannot be pickled, documents printed in worker processes are returned without it
+        return self.__dict__ | {"template": None}
 
     @property
     def authors(self):
@@ -200,17 +503,19 @@ class Document:
             return commit_sha_env
 
         try:
-            return str(check_output(["git", "rev-parse", "HEAD"], stderr=DEVNULL), "utf-8")[:8] + (
-                "-dirty" if check_output(["git", "status", "-s"]) else ""
+            # exits with 1 on the first difference to HEAD instead of listing all changed and untracked files
+            return check_output(["git", "rev-parse", "HEAD"], stderr=DEVNULL, encoding="utf-8")[:8] + (
+                "-dirty" if run(["git", "diff", "--quiet", "HEAD"], stderr=DEVNULL).returncode else ""
             )
 
         except CalledProcessError:
             return
 
-    def write_pdf(self, output_dir: Path, output_html: bool = False):
-        html = self.template.render(
-            date=date.today().isoformat(),
-            commit=self.get_commit(),
+    @cached_property
+    def html(self) -> str:
+        return self.template.render(
+            date=self.date,
+            commit=self.commit,
             articles=self.articles,
             title=self.title,
             alt_title=self.alt_title,
@@ -218,44 +523,138 @@ class Document:
             document=self,
         )
 
-        os.makedirs(output_dir, exist_ok=True)
+    @cached_property
+    def key(self) -> str:
+        """
+        Hash over everything the PDF is generated from: the rendered html, the links stripped from it (`pdf_strip`), the layout files and
+        the local files referenced in the html. The rendered html is hashed instead of the one passed to WeasyPrint, as it may be output as well.
+        """
+        source_dirs = {self.layout_dir, *(article.source.parent for article in self.articles)}
+        references = {urlparse(url) for url in _REFERENCE_RE.findall(self.html)}
+        referenced_files = {directory / unquote(url.path) for url in references if not url.scheme and url.path for directory in source_dirs}
+        fingerprint = json.dumps(
+            [
+                _package_version(),
+                _package_version("weasyprint"),
+                self.meta.get("pdf_strip"),
+                _directory_fingerprint(self.layout_dir) if self.layout_fingerprint is None else self.layout_fingerprint,
+                _files_fingerprint(referenced_files),
+            ]
+        )
+        return hashlib.sha1(self.html.encode("utf-8") + b"|" + fingerprint.encode("utf-8")).hexdigest()
 
-        if output_html:
-            with open(output_dir / f"{self.filename}.html", "w", encoding="utf-8") as html_file:
-                html_file.write(html)
+    def _is_unchanged(self, pdf_output_target: Path, html_output_target: Optional[Path], key_path: Path) -> bool:
+        if not pdf_output_target.exists() or (html_output_target and not html_output_target.exists()):
+            return False
+
+        try:
+            return key_path.read_text(encoding="utf-8") == self.key
+
+        except OSError:
+            return False
+
+    def write_pdf(self, output_dir: Path, output_html: bool = False, skip_unchanged: bool = False):
+        os.makedirs(output_dir, exist_ok=True)
 
         pdf_output_target = output_dir / f"{self.filename}.pdf"
-        HTML(
+        html_output_target = output_dir / f"{self.filename}.html" if output_html else None
+        key_path = CACHE_DIR / "pdf" / f"{hashlib.sha1(str(pdf_output_target.absolute()).encode('utf-8')).hexdigest()}.key"
+        if skip_unchanged and self._is_unchanged(pdf_output_target, html_output_target, key_path):
+            self.unchanged = True
+            return pdf_output_target
+
+        if html_output_target:
+            _write_atomic(html_output_target, self.html)
+
+        # weasyprint takes long to import, it is only loaded when a pdf is actually printed
+        from weasyprint import HTML
+
+        html, options = self._hoist_stylesheets(self._strip_for_pdf(self.html))
+        pdf = HTML(
             string=html,
             base_url=str(self.layout_dir),
             url_fetcher=self.url_fetcher,
         ).write_pdf(
-            target=pdf_output_target,
             pdf_forms=True,
+            **options,
         )
-        return pdf_output_target
+        # a partially written pdf would otherwise remain when printing is interrupted, e.g. in watch mode
+        _write_atomic(pdf_output_target, pdf)
 
-    def url_fetcher(self, url: str, timeout=10, ssl_context=None):
         try:
-            return default_url_fetcher(url, timeout=timeout, ssl_context=ssl_context)
+            _write_atomic(key_path, self.key)
 
-        except URLError:
-            if not url.startswith('file://'):
-                raise
+        except OSError as error:
+            warnings.warn(f"Could not store key of {pdf_output_target}: {error}")
+
+        return pdf_output_target
 
-            local_relative_path = Path(urlparse(url).path.removeprefix('/')).relative_to(self.layout_dir)
-            articles_source_directories = {a.source.parent for a in self.articles}
-            for source_dir in articles_source_directories:
-                try:
-                    return default_url_fetcher((source_dir / local_relative_path).as_uri(), timeout=timeout, ssl_context=ssl_context)
+    def _strip_for_pdf(self, html: str) -> str:
+        """Remove links listed in `pdf_strip` of the meta, e.g. stylesheets only used for the html output."""
+        if not (pdf_strip := self.meta.get("pdf_strip")):
+            return html
 
-                except URLError:
-                    pass
+        # a single href may be given as a plain string
+        hrefs = {pdf_strip} if isinstance(pdf_strip, str) else set(pdf_strip)  # type: ignore
 
-            raise
+        def strip_link(match: re.Match) -> str:
+            return "" if _parse_attributes(match[0]).get("href") in hrefs else match[0]
+
+        return _LINK_RE.sub(strip_link, html)
+
+    def _hoist_stylesheets(self, html: str) -> Tuple[str, dict]:
+        """Replace links to stylesheets of the layout with stylesheets parsed once per process, returns the options for `write_pdf`.
+
+        Passed stylesheets are user stylesheets in WeasyPrint, which only keeps the cascade when no other author styles than `style`
+        attributes remain in the document: these win over normal declarations of both origins, but not over important user declarations.
+        """
+        if _STYLE_RE.search(html):
+            return html, {}
+
+        links = []
+        for match in _LINK_RE.finditer(html):
+            attributes = _parse_attributes(match[0])
+            rel = attributes.get("rel", "").lower().split()
+            href = attributes.get("href", "")
+            mime_type = attributes.get("type", "text/css").split(";")[0].strip().lower()
+            if "stylesheet" not in rel or "alternate" in rel or not href or mime_type != "text/css":
+                # ignored by weasyprint as well
+                continue
+
+            if "media" in attributes or urlparse(href).scheme or href.startswith("/"):
+                # stylesheets remaining in the document would be author styles
+                return html, {}
+
+            path = (self.layout_dir / href).resolve()
+            if not path.is_file():
+                return html, {}
+
+            links.append((match, path))
+
+        if not links:
+            return html, {}
+
+        stylesheets = tuple((str(path), path.stat().st_mtime_ns) for _, path in links)
+        if _STYLE_ATTRIBUTE_RE.search(html) and any(_has_important_declarations(*stylesheet) for stylesheet in stylesheets):
+            return html, {}
+
+        css, font_config, counter_style = _load_stylesheets(stylesheets, self.url_fetcher)
+        parts, position = [], 0
+        for match, _ in links:
+            parts.append(html[position : match.start()])
+            position = match.end()
+
+        parts.append(html[position:])
+        return "".join(parts), {"stylesheets": css, "font_config": font_config, "counter_style": counter_style}
+
+    @cached_property
+    def url_fetcher(self) -> _DocumentUrlFetcher:
+        return _DocumentUrlFetcher(self.layout_dir, tuple(dict.fromkeys(article.source.parent for article in self.articles)))
 
 
 class Printer:
+    _markdown_instances: dict[tuple[int, str, bool], Markdown] = {}
+
     @staticmethod
     def _ensure_path(path: Path, dir: Optional[bool] = None, create: Optional[bool] = None):
         if not path.is_absolute():
@@ -292,6 +691,21 @@ class Printer:
             extensions.SaneListExtension(),
         ]
 
+    @staticmethod
+    def markdown_options(article: Article) -> tuple[int, str, bool]:
+        return int(str(article.meta.get("tab_length", 2))), str(article.meta.get("toc_depth", "2-6")), bool(article.meta.get("table_caption", True))
+
+    @classmethod
+    def get_markdown(cls, article: Article) -> Markdown:
+        """Return a reset markdown instance for the article, instances are shared between articles with the same options."""
+        options = cls.markdown_options(article)
+        if (md := cls._markdown_instances.get(options)) is None:
+            md = cls._markdown_instances[options] = Markdown(extensions=[e for e in cls.enabled_extensions(article) if e], tab_length=options[0])
+
+        md.reset()
+        md.treeprocessors["toc"].id_prefix = article.source.name
+        return md
+
     def __init__(
         self,
         input: Path,
@@ -304,8 +718,11 @@ class Printer:
         output_html: bool = False,
         output_md: bool = False,
         filename_filter: Optional[str] = None,
+        filename_filter_fullmatch: bool = False,
         meta: Optional[dict[str, object]] = None,
         keep_tree: bool = False,
+        jobs: Optional[int] = None,
+        force: bool = False,
     ):
         self.input = self._ensure_path(input)
         self.output_dir = self._ensure_path(output_dir, dir=True, create=True)
@@ -317,12 +734,13 @@ class Printer:
         self.output_html = output_html
         self.output_md = output_md
         self.filename_filter = re.compile(filename_filter) if filename_filter else None
+        self.filename_filter_fullmatch = filename_filter_fullmatch
         self.meta = meta or {}
         self.keep_tree = keep_tree
-        self.jinja_env = Environment(
-            autoescape=select_autoescape(),
-            loader=FileSystemLoader(searchpath=[self.layouts_dir]),
-        )
+        self.jobs = jobs or os.cpu_count() or 1
+        self.force = force
+        self._document_context: dict[str, object] = {}
+        self.jinja_env = self._create_jinja_env()
 
         if self.bundle:
             if not self.layout or not self.title:
@@ -335,83 +753,187 @@ class Printer:
             if self.title:
                 raise ValueError("A title cannot be specified when not using bundle.")
 
+    def _create_jinja_env(self):
+        return Environment(
+            autoescape=_layout_autoescape,
+            loader=FileSystemLoader(searchpath=[self.layouts_dir]),
+            bytecode_cache=_get_bytecode_cache("layouts"),
+        )
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["jinja_env"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.jinja_env = self._create_jinja_env()
+
     def _load_article(self, source: Path):
-        return Article(source=source, template_loader_searchpaths=[self.input], meta=deepcopy(self.meta))
+        # articles only replace top-level values of their meta, therefore a shallow copy suffices
+        return Article(source=source, template_loader_searchpaths=[self.input], meta=self.meta.copy(), use_content_cache=not self.force)
+
+    @staticmethod
+    def _walk_documents(root: str) -> Iterator[str]:
+        """
+        Find markdown and yaml files below root, skipping hidden entries and files starting with an underscore.
+
+        Entries are sorted per directory such that the files are yielded in the same order as sorting all paths as strings.
+        """
+
+        def scan(directory: str) -> Iterator[os.DirEntry]:
+            with os.scandir(directory) as entries:
+                return iter(sorted(entries, key=lambda entry: entry.name + "/" if entry.is_dir(follow_symlinks=False) else entry.name))
+
+        stack = [scan(root)]
+        while stack:
+            for entry in stack[-1]:
+                if entry.name.startswith("."):
+                    continue
+
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(scan(entry.path))
+                    break
+
+                if entry.name.endswith((".md", ".yaml")) and not entry.name.startswith("_") and entry.is_file():
+                    yield entry.path
+
+            else:
+                stack.pop()
+
+    def iter_documents(self) -> Iterator[Path]:
+        if not self.input.is_dir():
+            return
+
+        for file in self._walk_documents(str(self.input)):
+            yield Path(file)
 
     def get_documents(self):
-        return [
-            Path(file)
-            for file in sorted(
-                glob(os.path.join(self.input, "**/*.md"), recursive=True) + glob(os.path.join(self.input, "**/*.yaml"), recursive=True)
-            )
-        ]
+        return list(self.iter_documents())
 
-    def get_articles(self, documents: Optional[List[Path]] = None) -> Iterable[Article]:
+    def get_article_sources(self, documents: Optional[Iterable[Path]] = None) -> Iterable[Path]:
         if not self.input.is_dir():
-            yield self._load_article(self.input)
+            yield self.input
             return
 
         if documents is None:
-            documents = self.get_documents()
+            documents = self.iter_documents()
 
+        input_prefix = os.path.join(self.input, "")
         for article_path in documents:
             if article_path.name.startswith("_"):
                 continue
 
-            if self.filename_filter and not re.search(self.filename_filter, article_path.relative_to(self.input).as_posix()):
+            if self.filename_filter and not self._match_filename_filter(self._relative_posix_path(article_path, input_prefix)):
                 continue
 
+            yield article_path
+
+    def _relative_posix_path(self, path: Path, input_prefix: str) -> str:
+        """Path relative to the input directory, by removing the prefix of paths found below it instead of creating new paths."""
+        if (path_str := str(path)).startswith(input_prefix):
+            relative_path = path_str[len(input_prefix) :]
+            return relative_path if os.sep == "/" else relative_path.replace(os.sep, "/")
+
+        return path.relative_to(self.input).as_posix()
+
+    def _match_filename_filter(self, path: str):
+        if self.filename_filter_fullmatch:
+            return self.filename_filter.fullmatch(path)  # type: ignore  # only called when a filter is set
+
+        return self.filename_filter.search(path)  # type: ignore  # only called when a filter is set
+
+    def get_articles(self, documents: Optional[Iterable[Path]] = None) -> Iterable[Article]:
+        for article_path in self.get_article_sources(documents):
             yield self._load_article(article_path)
 
-    def execute(self, documents: Optional[List[Path]] = None):
-        self._load_template.cache_clear()
-        articles = list(self.get_articles(documents))
+    def _write_md(self, article: Article):
+        try:
+            with open(self.output_dir / article.source.name, "w", encoding="utf-8") as file:
+                file.write(article.content_md)
 
+        except Exception as error:
+            raise ValueError(f"Could not output md for {article.source}: {error}") from error
+
+    def _create_document(self, article: Article):
+        try:
+            template, layout_dir = self._load_template(article.meta.get('layout', self.layout))
+            return Document(
+                article.title,
+                article.alt_title,
+                article.filename,
+                template,
+                layout_dir,
+                articles=[article],
+                meta=self.meta | article.meta,
+                layout_fingerprint=self._layout_fingerprint(layout_dir),
+                **self._document_context,
+            )
+
+        except ValueError as error:
+            raise ValueError(f"Could not create document for {article.source}: {error}") from error
+
+    def _print_article(self, source: Path) -> Tuple[Document, Path]:
+        article = self._load_article(source)
         if self.output_md:
-            for article in articles:
-                try:
-                    with open(self.output_dir / article.source.name, "w", encoding="utf-8") as file:
-                        file.write(article.content_md)
+            self._write_md(article)
 
-                except Exception as error:
-                    raise ValueError(f"Could not output md for {article.source}: {error}") from error
+        doc = self._create_document(article)
+        output_dir = self.output_dir / (article.source.parent.relative_to(self.input) if self.keep_tree else ".")
+        return doc, doc.write_pdf(output_dir=output_dir, output_html=self.output_html, skip_unchanged=not self.force)
 
-        write_options = {"output_dir": self.output_dir, "output_html": self.output_html}
+    def execute(self, documents: Optional[Iterable[Path]] = None):
+        self._load_template.cache_clear()
+        self._layout_fingerprint.cache_clear()
+        # the same for all documents of a run, determined once instead of per document (and before workers receive the printer)
+        self._document_context = {"date": date.today().isoformat(), "commit": Document.get_commit()}
 
         if self.bundle:
+            # the search of the input directory already yields the documents in sorted order
+            articles = list(self.get_articles(None if documents is None else sorted(documents, key=str)))
+            if self.output_md:
+                for article in articles:
+                    self._write_md(article)
+
+            template, layout_dir = self._load_template(self.layout)
             doc = Document(
                 self.title,  # type: ignore  # title cannot be empty when bundle is set
                 self.alt_title or self.title,  # type: ignore  # title cannot be empty when bundle is set
                 self.title.replace(" ", "_"),
-                *self._load_template(self.layout),
+                template,
+                layout_dir,
                 articles=articles,
                 meta=self.meta,
+                layout_fingerprint=self._layout_fingerprint(layout_dir),
+                **self._document_context,
             )
-            yield doc, doc.write_pdf(**write_options)
+            yield doc, doc.write_pdf(output_dir=self.output_dir, output_html=self.output_html, skip_unchanged=not self.force)
+            return
 
-        else:
-            for article in articles:
-                try:
-                    doc = Document(
-                        article.title,
-                        article.alt_title,
-                        article.filename,
-                        *self._load_template(article.meta.get('layout', self.layout)),
-                        articles=[article],
-                        meta=self.meta | article.meta,
-                    )
-
-                except ValueError as error:
-                    raise ValueError(f"Could not create document for {article.source}: {error}") from error
-
-                yield doc, doc.write_pdf(
-                    **{
-                        **write_options,
-                        "output_dir": (
-                            write_options["output_dir"] / (doc.articles[0].source.parent.relative_to(self.input) if self.keep_tree else ".")
-                        ),
-                    }
-                )
+        # documents are printed while the input directory is still being searched, in the order in which they complete
+        sources = iter(self.get_article_sources(documents))
+        first_sources = list(islice(sources, 2))
+        if self.jobs < 2 or len(first_sources) < 2:
+            for source in chain(first_sources, sources):
+                yield self._print_article(source)
+
+            return
+
+        # WeasyPrint is not fork-safe on all platforms, therefore workers are spawned
+        with ProcessPoolExecutor(
+            max_workers=self.jobs,
+            mp_context=get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self,),
+        ) as pool:
+            futures = [pool.submit(_print_article_in_worker, source) for source in chain(first_sources, sources)]
+            try:
+                for future in as_completed(futures):
+                    yield future.result()
+
+            finally:
+                for future in futures:
+                    future.cancel()
 
     def _get_layout_dir(self, layout: str):
         if not layout:
@@ -433,7 +955,26 @@ class Printer:
     @cache
     def _load_template(self, layout):
         layout_dir = self._get_layout_dir(layout)
-        with self.try_files(layout_dir, ["index.html.j2", "index.html"]).open(mode="r", encoding="utf-8") as file:
-            template = self.jinja_env.from_string(file.read())
+        template_path = self.try_files(layout_dir, _LAYOUT_ENTRYPOINTS)
+        # loading by name instead of from_string allows jinja to reuse the compiled template from the bytecode cache
+        template = self.jinja_env.get_template(template_path.relative_to(self.layouts_dir).as_posix())
 
         return template, layout_dir
+
+    @cache
+    def _layout_fingerprint(self, layout_dir: Path):
+        """Fingerprint of all files of the layout, walked once per run instead of for every document."""
+        return _directory_fingerprint(layout_dir)
+
+
+_worker_printer: Optional[Printer] = None
+
+
+def _init_worker(printer: Printer):
+    """Receive the printer, including its compiled filename filter, once per worker process instead of with every task."""
+    global _worker_printer
+    _worker_printer = printer
+
+
+def _print_article_in_worker(source: Path) -> Tuple[Document, Path]:
+    return _worker_printer._print_article(source)  # type: ignore  # set by _init_worker
@@ -0,0 +1,97 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+# keep compiled templates and cached content out of the user's cache directory
+os.environ["MD2WEASYPDF_CACHE_DIR"] = tempfile.mkdtemp()
+
+import frontmatter  # noqa: E402
+from jinja2 import Environment  # noqa: E402
+
+from md2weasypdf.printer import Document, FileSystemWithFrontmatterLoader, Printer, _load_frontmatter, _strip_frontmatter  # noqa: E402
+
+LAYOUTS_DIR = Path(__file__).parent.parent / "md2weasypdf" / "layouts"
+
+# closing boundaries which are not exactly `---`, followed by a `---` rule in the content
+FRONTMATTER_WITH_RULES = [
+    "---\ntitle: a\n--- \nIntro\n\n---\n\nSection\n",
+    "---\ntitle: a\n----\nIntro\n\n---\n\nSection\n",
+]
+
+
+class StripFrontmatterTest(unittest.TestCase):
+    def test_closing_boundary_followed_by_rule(self):
+        for text in FRONTMATTER_WITH_RULES:
+            with self.subTest(text=text):
+                self.assertEqual(_strip_frontmatter(text), frontmatter.loads(text).content)
+                self.assertEqual(_strip_frontmatter(text), "Intro\n\n---\n\nSection")
+
+    def test_included_template(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for index, text in enumerate(FRONTMATTER_WITH_RULES):
+                (Path(directory) / f"_include{index}.md").write_text(text, encoding="utf-8")
+
+            env = Environment(loader=FileSystemWithFrontmatterLoader(searchpath=[directory]))
+            for index in range(len(FRONTMATTER_WITH_RULES)):
+                with self.subTest(index=index):
+                    self.assertEqual(env.from_string(f'{{% include "_include{index}.md" %}}').render(), "Intro\n\n---\n\nSection")
+
+
+class LoadFrontmatterTest(unittest.TestCase):
+    def test_closing_boundary_followed_by_rule(self):
+        for text in FRONTMATTER_WITH_RULES:
+            with self.subTest(text=text):
+                post = frontmatter.loads(text)
+                self.assertEqual(_load_frontmatter(text), (post.metadata, post.content))
+                self.assertEqual(_load_frontmatter(text), ({"title": "a"}, "Intro\n\n---\n\nSection"))
+
+    def test_without_frontmatter(self):
+        self.assertEqual(_load_frontmatter("\nIntro\n\n---\n\nSection\n"), ({}, "Intro\n\n---\n\nSection"))
+
+
+class StripForPdfTest(unittest.TestCase):
+    HTML = '<link rel="stylesheet" href="print.css"><link rel="stylesheet" href="web.css"><link rel="stylesheet" href="dark.css">'
+
+    def _strip_for_pdf(self, pdf_strip):
+        return Document("Title", "Title", "Title", None, Path("."), [], {"pdf_strip": pdf_strip}, "", "")._strip_for_pdf(self.HTML)  # type: ignore
+
+    def test_list(self):
+        self.assertEqual(self._strip_for_pdf(["web.css", "dark.css"]), '<link rel="stylesheet" href="print.css">')
+
+    def test_single_string(self):
+        self.assertEqual(
+            self._strip_for_pdf("web.css"),
+            '<link rel="stylesheet" href="print.css"><link rel="stylesheet" href="dark.css">',
+        )
+
+
+class HoistStylesheetsTest(unittest.TestCase):
+    def _hoist_stylesheets(self, html, css="p { color: red !important }"):
+        with tempfile.TemporaryDirectory() as directory:
+            (Path(directory) / "style.css").write_text(css, encoding="utf-8")
+            return Document("Title", "Title", "Title", None, Path(directory), [], {}, "", "")._hoist_stylesheets(html)  # type: ignore
+
+    def test_stylesheets_ignored_by_weasyprint(self):
+        for link in ['<link rel="alternate stylesheet" href="style.css">', '<link rel="stylesheet" type="text/x-scss" href="style.css">']:
+            with self.subTest(link=link):
+                self.assertEqual(self._hoist_stylesheets(f"{link}<p>Text</p>"), (f"{link}<p>Text</p>", {}))
+
+    def test_important_declarations_with_style_attribute(self):
+        html = '<link rel="stylesheet" href="style.css"><p style="color: blue !important">Text</p>'
+        self.assertEqual(self._hoist_stylesheets(html), (html, {}))
+
+
+class LoadTemplateTest(unittest.TestCase):
+    def test_layout_is_escaped(self):
+        with tempfile.TemporaryDirectory() as directory:
+            printer = Printer(input=Path(directory), output_dir=Path(directory) / "out", layouts_dir=LAYOUTS_DIR, layout="basic")
+            template, _ = printer._load_template("basic")
+            html = template.render(title="R&D <draft>", articles=[], meta={})
+
+        self.assertIn("<title>R&amp;D &lt;draft&gt;</title>", html)
+        self.assertNotIn("R&D <draft>", html)
+
+
+if __name__ == "__main__":
+    unittest.main()